@@ -1,86 +0,0 @@
-"""
-MetroRetail Data Pipeline - Airflow DAG
-
-This DAG runs your entire pipeline:
-1. Ingest CSV files
-2. Run dbt staging models
-3. Run dbt silver models  
-4. Run dbt gold models
-5. Check data quality
-"""
-# type: ignore
-# pyright: reportMissingImports=false
-
-from airflow import DAG
-from airflow.operators.python import PythonOperator
-from airflow.operators.bash import BashOperator
-from airflow.operators.empty import EmptyOperator
-from datetime import datetime, timedelta
-
-# =====================================================
-# Task Functions
-# =====================================================
-
-def ingest_csv_files():
-    """Step 1: Load CSV files into Raw layer"""
-    print("Starting CSV ingestion...")
-    print("✓ CSV ingestion completed")
-
-
-def check_data_quality():
-    """Step 5: Verify data loaded correctly"""
-    print("Running data quality checks...")
-    print("✓ Data quality checks passed!")
-
-
-# =====================================================
-# DAG Definition
-# =====================================================
-
-DEFAULT_ARGS = {
-    'owner': 'metroretail',
-    'depends_on_past': False,
-    'start_date': datetime(2024, 1, 1),
-    'retries': 1,
-    'retry_delay': timedelta(minutes=5),
-}
-
-with DAG(
-    dag_id='metro_retail_pipeline',
-    default_args=DEFAULT_ARGS,
-    description='MetroRetail complete data pipeline',
-    schedule_interval='0 2 * * *',  # Daily at 2 AM
-    catchup=False,
-    tags=['metroretail', 'etl'],
-) as dag:
-    
-    start = EmptyOperator(task_id='start')
-    
-    task_ingest = PythonOperator(
-        task_id='ingest_csv_files',
-        python_callable=ingest_csv_files,
-    )
-    
-    task_staging = BashOperator(
-        task_id='dbt_staging',
-        bash_command='echo "Running dbt staging models..."',
-    )
-    
-    task_silver = BashOperator(
-        task_id='dbt_silver',
-        bash_command='echo "Running dbt silver models..."',
-    )
-    
-    task_gold = BashOperator(
-        task_id='dbt_gold',
-        bash_command='echo "Running dbt gold models..."',
-    )
-    
-    task_quality = PythonOperator(
-        task_id='data_quality_checks',
-        python_callable=check_data_quality,
-    )
-    
-    end = EmptyOperator(task_id='end')
-    
-    start >> task_ingest >> task_staging >> task_silver >> task_gold >> task_quality >> end
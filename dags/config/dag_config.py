@@ -1,5 +1,6 @@
 """DAG Configuration for MetroRetail Pipeline"""
 
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -8,6 +9,10 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 DBT_PROJECT_DIR = PROJECT_ROOT / "dbt" / "metro_dbt"
 PIPELINES_DIR = PROJECT_ROOT / "pipelines"
 
+# dbt invocation (profiles.yml lives in the project directory)
+DBT_TARGET = os.getenv("DBT_TARGET", "dev")
+DBT_RUN_COMMAND = f'cd "{DBT_PROJECT_DIR}" && dbt run --profiles-dir . --target {DBT_TARGET}'
+
 # Default DAG arguments
 DEFAULT_DAG_ARGS = {
     'owner': 'metroretail',
@@ -23,6 +28,39 @@ DEFAULT_DAG_ARGS = {
 # Schedule: Daily at 2 AM
 SCHEDULE_INTERVAL = '0 2 * * *'
 
+# CSV ingestion fan-out (one mapped task per file)
+# Literal copy of FILE_TABLE_MAP keys (pipelines/config.py) - keeps DAG parsing free of its import side effects
+CSV_FILES = [
+    'pos_transactions_header.csv',
+    'pos_transactions_lines.csv',
+    'erp_products.csv',
+    'erp_stores.csv',
+    'erp_inventory.csv',
+    'crm_customers.csv',
+    'mkt_promotions.csv',
+    'api_weather.csv',
+]
+
+# Produced by the weather pull task; every other CSV can load in parallel with it
+WEATHER_CSV_FILE = 'api_weather.csv'
+
+# Pool capping concurrent loads so SQL Server isn't overwhelmed (start_airflow.sh reads these)
+CSV_INGEST_POOL = 'csv_ingest_pool'
+CSV_INGEST_POOL_SLOTS = 4
+
+# Tables row-counted by the data quality task (Raw tables from FILE_TABLE_MAP plus the fact table)
+DQ_TABLES = [
+    'Raw.pos_transactions_header',
+    'Raw.pos_transactions_lines',
+    'Raw.erp_products',
+    'Raw.erp_stores',
+    'Raw.erp_inventory',
+    'Raw.crm_customers',
+    'Raw.mkt_promotions',
+    'Raw.api_weather',
+    'Gold.fact_sales',
+]
+
 # Data quality thresholds
 DQ_THRESHOLDS = {
     'min_rows_gold_fact': 100,  # Minimum rows in fact table
@@ -2,7 +2,7 @@
 MetroRetail Data Pipeline - Airflow DAG
 
 This DAG runs your entire pipeline:
-1. Ingest CSV files
+1. Pull weather data and ingest it (in parallel with the other CSV files)
 2. Run dbt staging models
 3. Run dbt silver models  
 4. Run dbt gold models
@@ -12,16 +12,22 @@ This DAG runs your entire pipeline:
 # pyright: reportMissingImports=false
 
 from airflow import DAG
+from airflow.decorators import task
 from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.operators.empty import EmptyOperator
-from datetime import datetime
 import sys
 from pathlib import Path
 
 # Add config to path
 sys.path.insert(0, str(Path(__file__).parent))
-from config.dag_config import DEFAULT_DAG_ARGS, SCHEDULE_INTERVAL, DBT_PROJECT_DIR, PIPELINES_DIR
+from config.dag_config import (
+    PROJECT_ROOT, DEFAULT_DAG_ARGS, SCHEDULE_INTERVAL, DBT_RUN_COMMAND,
+    CSV_FILES, WEATHER_CSV_FILE, CSV_INGEST_POOL, CSV_INGEST_POOL_SLOTS, DQ_TABLES, DQ_THRESHOLDS,
+)
+
+# Make the pipelines package importable so tasks run in-process
+sys.path.insert(0, str(PROJECT_ROOT))
 
 # =====================================================
 # Task Functions
@@ -29,46 +35,51 @@ from config.dag_config import DEFAULT_DAG_ARGS, SCHEDULE_INTERVAL, DBT_PROJECT_D
 
 def pull_weather_data():
     """Step 0: Fetch weather data from API"""
-    import subprocess
+    from pipelines.pull_weather_data import main as run_weather
     
     print("Starting weather data pull...")
-    result = subprocess.run(
-        ['python', str(PIPELINES_DIR / 'pull_weather_data.py')],
-        capture_output=True,
-        text=True
-    )
-    
-    if result.returncode != 0:
-        raise Exception(f"Weather data pull failed: {result.stderr}")
-    
-    print(result.stdout)
+    run_weather()
     print("✓ Weather data pull completed")
 
 
-def ingest_csv_files():
-    """Step 1: Load CSV files into Raw layer"""
-    import subprocess
-    
-    print("Starting CSV ingestion...")
-    result = subprocess.run(
-        ['python', str(PIPELINES_DIR / 'ingest_csv.py'), '--all'],
-        capture_output=True,
-        text=True
-    )
+@task(
+    task_id='ingest_csv_files',
+    pool=CSV_INGEST_POOL,
+    max_active_tis_per_dag=CSV_INGEST_POOL_SLOTS,
+)
+def ingest_csv_file(file_name: str):
+    """Step 1: Load one CSV file into Raw layer (mapped over CSV_FILES)"""
+    from pipelines.ingest_csv import ingest_csv_file as run_ingest
     
-    if result.returncode != 0:
-        raise Exception(f"CSV ingestion failed: {result.stderr}")
+    print(f"Starting CSV ingestion: {file_name}")
+    if not run_ingest(file_name):
+        raise Exception(f"CSV ingestion failed for {file_name}")
     
-    print(result.stdout)
-    print("✓ CSV ingestion completed")
+    print(f"✓ CSV ingestion completed: {file_name}")
 
 
 def check_data_quality():
     """Step 5: Verify data loaded correctly"""
+    from pipelines.db_utils import DatabaseManager
+    
     print("Running data quality checks...")
-    print("✓ CSV files validated: 8/8 files processed")
-    print("✓ Weather data validated: 28,678 rows processed")
-    print("✓ dbt models validated: staging, silver, gold layers OK")
+    with DatabaseManager() as db:
+        counts = db.get_table_counts(DQ_TABLES)
+    
+    for table_name, count in counts.items():
+        print(f"  {table_name}: {count:,} rows")
+    
+    empty_tables = [t for t, count in counts.items() if count <= 0]
+    if empty_tables:
+        raise Exception(f"Data quality checks failed: empty tables {empty_tables}")
+    
+    fact_rows = counts.get('Gold.fact_sales', 0)
+    if fact_rows < DQ_THRESHOLDS['min_rows_gold_fact']:
+        raise Exception(
+            f"Data quality checks failed: Gold.fact_sales has {fact_rows:,} rows "
+            f"(minimum {DQ_THRESHOLDS['min_rows_gold_fact']:,})"
+        )
+    
     print("✓ Data quality checks passed!")
     return True
 
@@ -81,6 +92,7 @@ with DAG(
     dag_id='metro_retail_pipeline',
     default_args=DEFAULT_DAG_ARGS,
     description='MetroRetail complete data pipeline',
+    doc_md=__doc__,
     schedule_interval=SCHEDULE_INTERVAL,
     catchup=False,
     tags=['metroretail', 'etl'],
@@ -93,24 +105,28 @@ with DAG(
         python_callable=pull_weather_data,
     )
     
-    task_ingest = PythonOperator(
-        task_id='ingest_csv_files',
-        python_callable=ingest_csv_files,
+    # Source CSVs don't depend on the weather pull - load them alongside it
+    task_ingest_others = ingest_csv_file.expand(
+        file_name=[f for f in CSV_FILES if f != WEATHER_CSV_FILE]
+    )
+    
+    task_ingest_weather = ingest_csv_file.override(task_id='ingest_weather_csv')(
+        file_name=WEATHER_CSV_FILE
     )
     
     task_staging = BashOperator(
         task_id='dbt_staging',
-        bash_command='echo "✓ Staging models validated and ready for transformation"',
+        bash_command=f'{DBT_RUN_COMMAND} --select tag:staging',
     )
     
     task_silver = BashOperator(
         task_id='dbt_silver',
-        bash_command='echo "✓ Silver transformation layer complete"',
+        bash_command=f'{DBT_RUN_COMMAND} --select tag:silver',
     )
     
     task_gold = BashOperator(
         task_id='dbt_gold',
-        bash_command='echo "✓ Gold star schema layer complete"',
+        bash_command=f'{DBT_RUN_COMMAND} --select tag:gold',
     )
     
     task_quality = PythonOperator(
@@ -120,4 +136,7 @@ with DAG(
     
     end = EmptyOperator(task_id='end')
     
-    start >> task_weather >> task_ingest >> task_staging >> task_silver >> task_gold >> task_quality >> end
+    start >> task_weather >> task_ingest_weather
+    start >> task_ingest_others
+    [task_ingest_weather, task_ingest_others] >> task_staging
+    task_staging >> task_silver >> task_gold >> task_quality >> end
@@ -1,9 +1,12 @@
 {{
     config(
-        materialized = 'table',
+        materialized = 'incremental',
+        unique_key = 'Transaction_Line_ID',
+        incremental_strategy = 'merge',
+        merge_exclude_columns = ['Created_TS'],
+        on_schema_change = 'append_new_columns',
         schema = 'Gold',
         alias = 'fact_sales',
-        full_refresh = true,
         transient = false,
     )
 }}
@@ -25,6 +28,8 @@
     - Join lines to header for transaction context
     - All amounts are ADDITIVE measures
     - Supports detailed sales analysis at line level
+    - Incremental: only transactions from the last 2 days of loaded data
+      are re-read and merged on Transaction_Line_ID (use --full-refresh to rebuild)
 */
 
 WITH lines AS (
@@ -37,6 +42,10 @@ headers AS (
     SELECT *
     FROM {{ ref('pos_transactions_header_clean') }}
     WHERE Is_Valid = 1
+    {% if is_incremental() %}
+      -- 2-day lookback picks up late-arriving transactions
+      AND Transaction_TS >= (SELECT DATEADD(DAY, -2, MAX(Transaction_TS)) FROM {{ this }})
+    {% endif %}
 ),
 
 -- Join lines with headers to get complete transaction context
@@ -16,6 +16,7 @@ DATA_DIR = PROJECT_ROOT / "data"
 SAMPLE_DIR = DATA_DIR / "sample"
 RAW_DIR = DATA_DIR / "raw"
 LOGS_DIR = PROJECT_ROOT / "logs"
+CACHE_DIR = DATA_DIR / "_cache"  # Parsed files / API responses shared between runs and tasks
 
 # Ensure directories exist
 RAW_DIR.mkdir(parents=True, exist_ok=True)
@@ -50,6 +51,12 @@ else:
         f"PWD={SQL_PASSWORD};"
     )
 
+# Optional BULK INSERT staging (off unless BULK_LOAD_DIR is set)
+# BULK_LOAD_DIR is where the pipeline writes staged files; it must be readable by SQL Server.
+# BULK_LOAD_SERVER_DIR is the same directory as SQL Server sees it (e.g. /mnt/c/bulk -> C:\bulk)
+BULK_LOAD_DIR = Path(os.environ["BULK_LOAD_DIR"]) if os.getenv("BULK_LOAD_DIR") else None
+BULK_LOAD_SERVER_DIR = os.getenv("BULK_LOAD_SERVER_DIR", os.getenv("BULK_LOAD_DIR"))
+
 # Source system mappings
 SOURCE_SYSTEMS = {
     "pos": "POS",
@@ -0,0 +1,98 @@
+"""
+CSV reading helpers shared by the ingestion and weather pipelines
+Every column is read as text (Raw tables are all VARCHAR)
+Parsed files can be cached as parquet so later steps skip re-parsing
+"""
+
+import csv
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Iterator
+
+# Package import when loaded from the Airflow DAG, flat import when run as a script
+if __package__:
+    from .config import CACHE_DIR
+else:
+    from config import CACHE_DIR
+
+# Streaming read settings - memory stays bounded to ~one block per file
+CSV_BLOCK_SIZE = 16 << 20  # 16 MB
+CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null'
+]  # Same tokens pandas treats as missing
+
+
+def text_convert_options(file_path: Path) -> pacsv.ConvertOptions:
+    """
+    Arrow convert options that keep every column of the file as text
+    """
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        columns = next(csv.reader(f))
+    
+    return pacsv.ConvertOptions(
+        column_types={col: pa.string() for col in columns},
+        null_values=CSV_NULL_VALUES,
+        strings_can_be_null=True
+    )
+
+
+def parquet_cache_path(file_path: Path) -> Path:
+    """
+    Location of the parquet copy of a parsed CSV file
+    """
+    return CACHE_DIR / f"{file_path.stem}.parquet"
+
+
+def read_csv_table(file_path: Path, cache: bool = False) -> pa.Table:
+    """
+    Read a whole CSV file as text columns
+    With cache=True the parsed table is also written as parquet for
+    read_csv_batches to pick up
+    """
+    table = pacsv.read_csv(file_path, convert_options=text_convert_options(file_path))
+    
+    if cache:
+        # Readers may run concurrently - write aside and swap in so they never see a partial file
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(suffix='.tmp', dir=CACHE_DIR, delete=False) as tmp:
+            tmp_path = tmp.name
+        try:
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, parquet_cache_path(file_path))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    
+    return table
+
+
+def read_csv_batches(file_path: Path) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file as DataFrames of roughly CSV_BLOCK_SIZE bytes each
+    Uses the parquet copy instead when it is newer than the CSV and readable
+    """
+    cache_file = parquet_cache_path(file_path)
+    batches = None
+    
+    if cache_file.exists() and cache_file.stat().st_mtime >= file_path.stat().st_mtime:
+        try:
+            batches = pq.ParquetFile(cache_file).iter_batches()
+        except Exception:
+            batches = None  # Unreadable copy - parse the CSV instead
+    
+    if batches is None:
+        batches = pacsv.open_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            convert_options=text_convert_options(file_path)
+        )
+    
+    for batch in batches:
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype)
@@ -6,10 +6,19 @@ FIXED: Removed Unicode characters for Windows compatibility
 
 import pyodbc
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import tempfile
 from datetime import datetime
-from typing import Optional, Dict, Any
+from pathlib import Path
+from typing import Optional, Dict, Any, List
 import logging
-from config import CONNECTION_STRING
+
+# Package import when loaded from the Airflow DAG, flat import when run as a script
+if __package__:
+    from .config import CONNECTION_STRING, BULK_LOAD_DIR, BULK_LOAD_SERVER_DIR
+else:
+    from config import CONNECTION_STRING, BULK_LOAD_DIR, BULK_LOAD_SERVER_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +30,28 @@ class DatabaseManager:
         self.conn_str = CONNECTION_STRING
         self.conn = None
         self.cursor = None
+        # INSERT text per (table, columns) so repeated shapes reuse the same statement
+        self._prep_cache: Dict[tuple, str] = {}
+    
+    def __enter__(self):
+        """Open one connection to reuse for a whole ingestion run"""
+        if not self.connect():
+            raise ConnectionError("Database connection failed")
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disconnect()
+        return False
     
     def connect(self):
         """Establish database connection"""
         try:
             self.conn = pyodbc.connect(self.conn_str)
+            # Explicit transactions - callers decide when to commit
+            self.conn.autocommit = False
             self.cursor = self.conn.cursor()
+            # Bind parameter arrays and send executemany as a single batch
+            self.cursor.fast_executemany = True
             logger.info("[OK] Database connection established")
             return True
         except Exception as e:
@@ -99,9 +124,14 @@ class DatabaseManager:
             return False
     
     def bulk_insert_dataframe(self, df: pd.DataFrame, table_name: str, 
-                              batch_size: int = 1000) -> int:
+                              batch_size: int = 10000,
+                              chunked: bool = False,
+                              commit: bool = True) -> int:
         """
         Bulk insert DataFrame into SQL Server table
+        Sends all rows in one fast_executemany call and commits once;
+        set chunked=True to insert and commit every batch_size rows instead.
+        With commit=False the caller owns the transaction.
         Returns number of rows inserted
         """
         if df.empty:
@@ -109,33 +139,45 @@ class DatabaseManager:
             return 0
         
         try:
-            # Convert all columns to strings to match VARCHAR schema
-            df_str = df.astype(str)
-            
-            # Replace pandas 'nan' strings with None for NULL values
-            df_str = df_str.replace('nan', None)
-            df_str = df_str.replace('None', None)
+            # Format values as text in Arrow to match VARCHAR schema;
+            # nulls come back as None so pyodbc sends real NULLs
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            arrays = [
+                col if pa.types.is_string(col.type) or pa.types.is_large_string(col.type)
+                else pc.cast(col, pa.string())
+                for col in table.columns
+            ]
             
             # Get column names from DataFrame
-            columns = df_str.columns.tolist()
-            placeholders = ','.join(['?' for _ in columns])
-            columns_str = ','.join([f"[{col}]" for col in columns])
+            columns = df.columns.tolist()
+            cache_key = (table_name, tuple(columns))
+            sql = self._prep_cache.get(cache_key)
+            if sql is None:
+                placeholders = ','.join(['?' for _ in columns])
+                columns_str = ','.join([f"[{col}]" for col in columns])
+                sql = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
+                self._prep_cache[cache_key] = sql
             
-            sql = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
+            # Fixed parameter sizes - fast_executemany won't re-measure strings
+            self.cursor.setinputsizes([(pyodbc.SQL_WVARCHAR, 4000, 0)] * len(columns))
             
-            # Convert DataFrame to list of tuples
-            data = [tuple(row) for row in df_str.values]
+            # Convert columns to list of row tuples
+            data = list(zip(*(col.to_pylist() for col in arrays)))
             
-            # Batch insert
-            total_inserted = 0
-            for i in range(0, len(data), batch_size):
-                batch = data[i:i + batch_size]
-                self.cursor.executemany(sql, batch)
-                self.conn.commit()
-                total_inserted += len(batch)
-                
-                if (i + batch_size) % 10000 == 0:
+            if chunked:
+                total_inserted = 0
+                for i in range(0, len(data), batch_size):
+                    batch = data[i:i + batch_size]
+                    self.cursor.executemany(sql, batch)
+                    if commit:
+                        self.conn.commit()
+                    total_inserted += len(batch)
                     logger.info(f"  Inserted {total_inserted:,} rows...")
+            else:
+                self.cursor.executemany(sql, data)
+                if commit:
+                    self.conn.commit()
+                total_inserted = len(data)
             
             logger.info(f"[OK] Bulk insert completed: {total_inserted:,} rows into {table_name}")
             return total_inserted
@@ -144,6 +186,75 @@ class DatabaseManager:
             logger.error(f"[ERROR] Bulk insert failed: {e}")
             self.conn.rollback()
             raise
+        finally:
+            # Input sizes stick to the cursor - clear them so manifest queries bind normally
+            self.cursor.setinputsizes(None)
+    
+    def bulk_load_csv(self, df: pd.DataFrame, table_name: str,
+                      format_file: Optional[str] = None,
+                      commit: bool = True) -> int:
+        """
+        Bulk load DataFrame into SQL Server table using BULK INSERT
+        Writes the rows to a temporary CSV under BULK_LOAD_DIR and lets SQL Server
+        read it from BULK_LOAD_SERVER_DIR; raises ValueError when not configured.
+        Without a format file, rows land in a #temp table first and are copied
+        by column name, since Raw tables carry Raw_ID/Load_Timestamp columns.
+        With commit=False the caller owns the transaction.
+        Returns number of rows loaded
+        """
+        if BULK_LOAD_DIR is None:
+            raise ValueError("BULK_LOAD_DIR is not set - BULK INSERT staging is disabled")
+        
+        if df.empty:
+            logger.warning("Empty DataFrame - nothing to load")
+            return 0
+        
+        with tempfile.NamedTemporaryFile(suffix='.csv', dir=BULK_LOAD_DIR, delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        sep = '\\' if '\\' in BULK_LOAD_SERVER_DIR else '/'
+        server_path = BULK_LOAD_SERVER_DIR.rstrip('\\/') + sep + tmp_path.name
+        
+        try:
+            df.to_csv(tmp_path, index=False, header=False, lineterminator='\n')
+            
+            options = ["FORMAT = 'CSV'", "CODEPAGE = '65001'", "FIRSTROW = 1",
+                       "BATCHSIZE = 50000", "TABLOCK"]
+            
+            if format_file:
+                options.append(f"FORMATFILE = '{format_file}'")
+                target = table_name
+            else:
+                options += ["FIELDTERMINATOR = ','", "ROWTERMINATOR = '0x0a'"]
+                columns = df.columns.tolist()
+                columns_str = ','.join([f"[{col}]" for col in columns])
+                stage_cols = ','.join([f"[{col}] NVARCHAR(MAX) NULL" for col in columns])
+                self.cursor.execute(f"CREATE TABLE #bulk_stage ({stage_cols})")
+                target = "#bulk_stage"
+            
+            # TABLOCK allows minimal logging (tempdb, or SIMPLE/BULK_LOGGED targets)
+            self.cursor.execute(
+                f"BULK INSERT {target} FROM '{server_path}' WITH ({', '.join(options)})"
+            )
+            
+            if not format_file:
+                self.cursor.execute(
+                    f"INSERT INTO {table_name} WITH (TABLOCK) ({columns_str}) "
+                    f"SELECT {columns_str} FROM #bulk_stage"
+                )
+                self.cursor.execute("DROP TABLE #bulk_stage")
+            
+            if commit:
+                self.conn.commit()
+            logger.info(f"[OK] Bulk load completed: {len(df):,} rows into {table_name}")
+            return len(df)
+            
+        except Exception as e:
+            logger.error(f"[ERROR] Bulk load failed: {e}")
+            self.conn.rollback()
+            raise
+        
+        finally:
+            tmp_path.unlink(missing_ok=True)
     
     def execute_query(self, query: str) -> pd.DataFrame:
         """
@@ -168,6 +279,22 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"[ERROR] Failed to get table count: {e}")
             return -1
+    
+    def get_table_counts(self, table_names: List[str]) -> Dict[str, int]:
+        """
+        Get row counts for several tables in a single round trip
+        Returns dictionary: table_name -> count; query errors are raised
+        """
+        try:
+            sql = " UNION ALL ".join(
+                f"SELECT '{t}' AS table_name, COUNT_BIG(*) AS cnt FROM {t}"
+                for t in table_names
+            )
+            self.cursor.execute(sql)
+            return {row.table_name: row.cnt for row in self.cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"[ERROR] Failed to get table counts: {e}")
+            raise
 
 
 def generate_batch_id(source: str, entity: str) -> str:
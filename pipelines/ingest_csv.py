@@ -4,7 +4,6 @@ Loads CSV files from data/sample/ into Raw layer tables
 Handles manifest tracking and error logging
 """
 
-import pandas as pd
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -14,32 +13,47 @@ from typing import Optional , Dict
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
-from config import SAMPLE_DIR, FILE_TABLE_MAP
-from db_utils import DatabaseManager, generate_batch_id
+# Package import when loaded from the Airflow DAG, flat import when run as a script
+if __package__:
+    from .config import SAMPLE_DIR, FILE_TABLE_MAP, LOGS_DIR, BULK_LOAD_DIR
+    from .csv_utils import read_csv_batches
+    from .db_utils import DatabaseManager, generate_batch_id
+else:
+    from config import SAMPLE_DIR, FILE_TABLE_MAP, LOGS_DIR, BULK_LOAD_DIR
+    from csv_utils import read_csv_batches
+    from db_utils import DatabaseManager, generate_batch_id
 
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('logs/ingestion.log'),
+        logging.FileHandler(LOGS_DIR / 'ingestion.log'),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
-
-def ingest_csv_file(file_name: str, truncate: bool = False) -> bool:
+def ingest_csv_file(file_name: str, truncate: bool = False,
+                    db: Optional[DatabaseManager] = None) -> bool:
     """
     Ingest a single CSV file into Raw layer
     
     Args:
         file_name: Name of CSV file (e.g., 'erp_products.csv')
         truncate: Whether to truncate target table before insert
+        db: Open connection to reuse (a new one is opened if omitted)
     
     Returns:
         True if successful, False otherwise
     """
+    if db is None:
+        try:
+            with DatabaseManager() as db:
+                return ingest_csv_file(file_name, truncate=truncate, db=db)
+        except ConnectionError:
+            return False
+    
     logger.info("=" * 70)
     logger.info(f"Starting ingestion: {file_name}")
     logger.info("=" * 70)
@@ -66,33 +80,55 @@ def ingest_csv_file(file_name: str, truncate: bool = False) -> bool:
     logger.info(f"Target table: {target_table}")
     
     try:
-        # Read CSV file
-        logger.info(f"Reading CSV: {file_path}")
-        df = pd.read_csv(file_path, low_memory=False)
-        logger.info(f"  Rows read: {len(df):,}")
-        logger.info(f"  Columns: {', '.join(df.columns.tolist())}")
+        db.start_manifest(batch_id, source_system, entity_name, file_name)
         
-        # Add metadata columns
-        df['Batch_ID'] = batch_id
-        df['Source_File'] = file_name
+        if truncate:
+            db.truncate_table(target_table)
         
-        # Special handling for weather data - rename Store_ID to Retail_Location_ID
-        if file_name == 'api_weather.csv' and 'Store_ID' in df.columns:
-            df = df.rename(columns={'Store_ID': 'Retail_Location_ID'})
+        # Stream the CSV and insert each block as it is parsed
+        logger.info(f"Streaming CSV: {file_path}")
+        rows_inserted = 0
+        use_bulk_load = BULK_LOAD_DIR is not None
         
-        logger.info(f"✓ Successfully processed {file_name}")
-        logger.info(f"  Ready for insertion: {len(df):,} rows")
-        return True
+        for df in read_csv_batches(file_path):
+            logger.info(f"  Rows read: {len(df):,}")
+            
+            # Add metadata columns
+            df['Batch_ID'] = batch_id
+            df['Source_File'] = file_name
+            
+            # Special handling for weather data - rename Store_ID to Retail_Location_ID
+            if file_name == 'api_weather.csv' and 'Store_ID' in df.columns:
+                df = df.rename(columns={'Store_ID': 'Retail_Location_ID'})
+            
+            # Only metadata columns and renames were applied, so the frame can be
+            # handed to BULK INSERT as-is when a staging directory is configured;
+            # fall back to executemany if the server still rejects it
+            if use_bulk_load:
+                try:
+                    rows_inserted += db.bulk_load_csv(df, target_table, commit=False)
+                    continue
+                except Exception as e:
+                    # Earlier blocks were rolled back with this one - don't hide it
+                    if rows_inserted:
+                        raise
+                    logger.warning(f"[WARN] BULK INSERT unavailable, using executemany: {e}")
+                    use_bulk_load = False
+            
+            rows_inserted += db.bulk_insert_dataframe(df, target_table, commit=False)
         
-    except Exception as e:
-        logger.error(f"[ERROR] Failed to process {file_name}: {e}")
-        return False
+        # One commit per file
+        db.conn.commit()
+        db.complete_manifest(batch_id, rows_inserted)
         
-        logger.info("=" * 70)
+        logger.info(f"✓ Successfully ingested {file_name}")
+        logger.info(f"  Rows inserted: {rows_inserted:,}")
         return True
         
     except Exception as e:
-        logger.error(f"[ERROR] Processing failed: {e}")
+        logger.error(f"[ERROR] Failed to process {file_name}: {e}")
+        db.conn.rollback()
+        db.complete_manifest(batch_id, 0, status='FAILED', error_message=str(e))
         return False
     
     finally:
@@ -115,9 +151,14 @@ def ingest_all_csv_files(truncate: bool = False) -> Dict[str, bool]:
     
     results = {}
     
-    for file_name in FILE_TABLE_MAP.keys():
-        success = ingest_csv_file(file_name, truncate=truncate)
-        results[file_name] = success
+    # One connection for the whole run
+    try:
+        with DatabaseManager() as db:
+            for file_name in FILE_TABLE_MAP.keys():
+                success = ingest_csv_file(file_name, truncate=truncate, db=db)
+                results[file_name] = success
+    except ConnectionError:
+        results = {file_name: False for file_name in FILE_TABLE_MAP}
     
     # Summary
     logger.info("\n" + "=" * 70)
@@ -7,11 +7,26 @@ NO MISSING VALUES - 100% complete data
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from pathlib import Path
 import logging
-from typing import Dict
+import os
+import tempfile
+from typing import Dict, Optional
+
+# Package import when loaded from the Airflow DAG, flat import when run as a script
+if __package__:
+    from .config import SAMPLE_DIR, CACHE_DIR
+    from .csv_utils import read_csv_table
+else:
+    from config import SAMPLE_DIR, CACHE_DIR
+    from csv_utils import read_csv_table
 
 # Setup logging
 logging.basicConfig(
@@ -23,9 +38,21 @@ logger = logging.getLogger(__name__)
 # Configuration
 START_DATE = "2023-01-01"
 END_DATE = datetime.now().strftime("%Y-%m-%d")
-OUTPUT_DIR = Path("data/sample")    
-SAMPLE_DIR = Path("data/sample")
+OUTPUT_DIR = SAMPLE_DIR
 OUTPUT_FILE = OUTPUT_DIR / "api_weather.csv"
+WEATHER_CACHE_DIR = CACHE_DIR / "weather"  # Per-store API responses (parquet)
+MAX_WORKERS = 8  # Concurrent API requests (one per store)
+
+# Final output columns, in file order
+WEATHER_SCHEMA = pa.schema([
+    ("Weather_Date", pa.string()),
+    ("Store_ID", pa.string()),
+    ("Temperature_C", pa.float64()),
+    ("Precipitation_mm", pa.float64()),
+    ("Weather_Condition", pa.string()),
+    ("Batch_ID", pa.string()),
+    ("Source_File", pa.string()),
+])
 
 # ---------------------------------------------
 # SAMPLE CITY → COORDINATE LOOKUP
@@ -44,6 +71,26 @@ CITY_COORDINATES = {
 DEFAULT_LAT = 25.0000
 DEFAULT_LON = 45.0000
 
+# WMO weather code → readable condition
+WEATHER_CODE_MAP = {
+    0: "Clear",
+    1: "Mainly Clear",
+    2: "Partly Cloudy",
+    3: "Overcast",
+    45: "Foggy",
+    48: "Foggy",
+    51: "Light Drizzle",
+    53: "Moderate Drizzle",
+    55: "Dense Drizzle",
+    61: "Slight Rain",
+    63: "Moderate Rain",
+    65: "Heavy Rain",
+    71: "Slight Snow",
+    73: "Moderate Snow",
+    75: "Heavy Snow",
+    95: "Thunderstorm",
+}
+
 
 def load_store_coordinates() -> Dict[str, Dict]:
     """
@@ -57,29 +104,48 @@ def load_store_coordinates() -> Dict[str, Dict]:
         logger.error(f"erp_stores.csv not found at {stores_file}")
         raise FileNotFoundError("erp_stores.csv missing")
 
-    df = pd.read_csv(stores_file)
-
-    locations = {}
-
-    for _, row in df.iterrows():
-        store_id = row["Store_ID"].strip()
-        city = row["City"].strip()
-        store_name = row["Store_Name"]
-
-        # Map city to coordinates (fallback if unknown)
-        coords = CITY_COORDINATES.get(city, {"lat": DEFAULT_LAT, "lon": DEFAULT_LON})
-
-        locations[store_id] = {
-            "lat": coords["lat"],
-            "lon": coords["lon"],
-            "name": store_name,
-            "city": city
-        }
-
-    return locations
-
-
-def fetch_weather_data(lat: float, lon: float, start: str, end: str) -> pd.DataFrame:
+    # Parsed as text and cached as parquet - the erp_stores ingest reuses it
+    df = read_csv_table(stores_file, cache=True).to_pandas()
+    df[["Store_ID", "City"]] = df[["Store_ID", "City"]].apply(lambda col: col.str.strip())
+
+    # Map city to coordinates (fallback if unknown)
+    coords_df = (
+        pd.DataFrame.from_dict(CITY_COORDINATES, orient="index")
+        .rename_axis("City")
+        .reset_index()
+    )
+    merged = (
+        df.merge(coords_df, on="City", how="left")
+        .fillna({"lat": DEFAULT_LAT, "lon": DEFAULT_LON})
+        .drop_duplicates(subset="Store_ID", keep="last")
+        .set_index("Store_ID")
+    )
+
+    return (
+        merged[["lat", "lon", "Store_Name", "City"]]
+        .rename(columns={"Store_Name": "name", "City": "city"})
+        .to_dict(orient="index")
+    )
+
+
+def create_session() -> requests.Session:
+    """
+    Create an HTTP session that reuses connections across store requests.
+    Retries rate-limit and transient server errors with backoff.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=16)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_weather_data(lat: float, lon: float, start: str, end: str,
+                       session: Optional[requests.Session] = None) -> pd.DataFrame:
     """Fetch weather data from Open-Meteo API."""
     
     base_url = "https://archive-api.open-meteo.com/v1/archive"
@@ -94,7 +160,8 @@ def fetch_weather_data(lat: float, lon: float, start: str, end: str) -> pd.DataF
     }
 
     try:
-        response = requests.get(base_url, params=params, timeout=30)
+        http = session or requests
+        response = http.get(base_url, params=params, timeout=30)
         response.raise_for_status()
         data = response.json()
 
@@ -112,28 +179,54 @@ def fetch_weather_data(lat: float, lon: float, start: str, end: str) -> pd.DataF
         return pd.DataFrame()
 
 
-def map_weather_code(code: int) -> str:
-    """Convert weather code into a readable condition."""
-    
-    code_map = {
-        0: "Clear",
-        1: "Mainly Clear",
-        2: "Partly Cloudy",
-        3: "Overcast",
-        45: "Foggy",
-        48: "Foggy",
-        51: "Light Drizzle",
-        53: "Moderate Drizzle",
-        55: "Dense Drizzle",
-        61: "Slight Rain",
-        63: "Moderate Rain",
-        65: "Heavy Rain",
-        71: "Slight Snow",
-        73: "Moderate Snow",
-        75: "Heavy Snow",
-        95: "Thunderstorm",
-    }
-    return code_map.get(code, "Unknown")
+def fetch_store_weather(store_id: str, lat: float, lon: float,
+                        session: Optional[requests.Session] = None) -> pd.DataFrame:
+    """
+    Fetch weather for one store, reusing its cached API responses.
+    Only days after the last complete cached day are requested.
+    The cache is keyed by store, coordinates and START_DATE.
+    """
+    cache_file = WEATHER_CACHE_DIR / f"{store_id}_{lat:.4f}_{lon:.4f}_{START_DATE}.parquet"
+    cached = pd.DataFrame()
+    start = START_DATE
+
+    if cache_file.exists():
+        try:
+            cached = pd.read_parquet(cache_file)
+        except Exception as e:
+            logger.warning(f"  {store_id}: unreadable cache, refetching from {START_DATE}: {e}")
+
+    if not cached.empty:
+        # Archive data lags a few days - refetch anything not yet complete
+        complete_dates = cached.loc[cached["temperature_c"].notna(), "date"]
+        if complete_dates.empty:
+            cached = pd.DataFrame()
+        else:
+            last_date = complete_dates.max()
+            cached = cached[cached["date"] <= last_date]
+            start = (pd.Timestamp(last_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+    if start > END_DATE:
+        logger.info(f"  {store_id}: cache up to date")
+        return cached
+
+    df = fetch_weather_data(lat=lat, lon=lon, start=start, end=END_DATE, session=session)
+
+    if df.empty:
+        return cached
+
+    df = pd.concat([cached, df], ignore_index=True)
+
+    # Write beside the target and swap in, so a killed run never leaves a partial file
+    with tempfile.NamedTemporaryFile(suffix=".tmp", dir=WEATHER_CACHE_DIR, delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_file)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return df
 
 
 def main():
@@ -143,30 +236,41 @@ def main():
 
     # Ensure directory exists
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    WEATHER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
     # Load stores from ERP file
     locations = load_store_coordinates()
     logger.info(f"Loaded {len(locations)} stores from ERP file")
 
     batch_id = f"api_weather_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    all_weather = []
-
-    for store_id, loc in locations.items():
-        logger.info(f"Fetching weather for {loc['name']} in {loc['city']} ({store_id})...")
-
-        df = fetch_weather_data(
-            lat=loc["lat"],
-            lon=loc["lon"],
-            start=START_DATE,
-            end=END_DATE
-        )
+    tables = []
+
+    # Requests are independent HTTP I/O - overlap them across stores
+    with create_session() as session, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        for store_id, loc in locations.items():
+            logger.info(f"Fetching weather for {loc['name']} in {loc['city']} ({store_id})...")
+            future = executor.submit(
+                fetch_store_weather,
+                store_id=store_id,
+                lat=loc["lat"],
+                lon=loc["lon"],
+                session=session
+            )
+            futures[future] = store_id
+
+        results = {futures[future]: future.result() for future in as_completed(futures)}
+
+    # Assemble in store order so the output file is deterministic
+    for store_id in locations:
+        df = results[store_id]
 
         if df.empty:
             logger.warning(f"No data for store {store_id}")
             continue
 
         df["Store_ID"] = store_id
-        df["Weather_Condition"] = df["weather_code"].apply(map_weather_code)
+        df["Weather_Condition"] = df["weather_code"].map(WEATHER_CODE_MAP).fillna("Unknown")
 
         df = df.rename(columns={
             "date": "Weather_Date",
@@ -177,38 +281,30 @@ def main():
         df["Batch_ID"] = batch_id
         df["Source_File"] = "api_weather.csv"
 
-        all_weather.append(df)
-        logger.info(f"  [OK] {len(df)} records added")
+        # Select final columns in correct order; tables concatenate without copying
+        tables.append(pa.Table.from_pandas(df, schema=WEATHER_SCHEMA, preserve_index=False))
+        logger.info(f"  [OK] {store_id}: {len(df)} records added")
 
-    if not all_weather:
+    if not tables:
         logger.error("No weather data collected!")
         return
 
-    final_df = pd.concat(all_weather, ignore_index=True)
+    table = pa.concat_tables(tables)
 
     # NO MISSING VALUES INJECTED - Keep 100% complete data
     logger.info("[OK] Weather data complete - no missing values injected")
 
-    # Select final columns in correct order
-    final_df = final_df[[
-        "Weather_Date",
-        "Store_ID",
-        "Temperature_C",
-        "Precipitation_mm",
-        "Weather_Condition",
-        "Batch_ID",
-        "Source_File"
-    ]]
+    # Save to CSV (multi-threaded Arrow writer)
+    pacsv.write_csv(table, OUTPUT_FILE)
 
-    # Save to CSV
-    final_df.to_csv(OUTPUT_FILE, index=False)
+    date_range = pc.min_max(table["Weather_Date"])
 
     logger.info("=" * 60)
     logger.info(f"[OK] Weather data saved → {OUTPUT_FILE}")
-    logger.info(f"   Total Records: {len(final_df):,}")
-    logger.info(f"   Date Range: {final_df['Weather_Date'].min()} to {final_df['Weather_Date'].max()}")
-    logger.info(f"   Stores Covered: {final_df['Store_ID'].nunique()}")
-    logger.info(f"   Missing Temperature_C: {final_df['Temperature_C'].isna().sum()} (0%)")
+    logger.info(f"   Total Records: {table.num_rows:,}")
+    logger.info(f"   Date Range: {date_range['min']} to {date_range['max']}")
+    logger.info(f"   Stores Covered: {pc.count_distinct(table['Store_ID'])}")
+    logger.info(f"   Missing Temperature_C: {table['Temperature_C'].null_count} (0%)")
     logger.info("=" * 60)
 
 
@@ -49,6 +49,17 @@ if pgrep -f "airflow webserver" > /dev/null; then
     echo -e "${YELLOW}WARNING: Airflow webserver is already running${NC}"
 fi
 
+# Pool used by the mapped CSV ingestion tasks (idempotent, sized from dags/config/dag_config.py)
+# Command substitution (unlike < <(...)) lets set -e stop the script if the lookup fails
+POOL_CONFIG=$(python -c "import sys; sys.path.insert(0, 'dags'); from config.dag_config import CSV_INGEST_POOL, CSV_INGEST_POOL_SLOTS; print(CSV_INGEST_POOL, CSV_INGEST_POOL_SLOTS)")
+read -r POOL_NAME POOL_SLOTS <<< "$POOL_CONFIG"
+if [ -z "$POOL_NAME" ] || [ -z "$POOL_SLOTS" ]; then
+    echo -e "${RED}ERROR: Could not read CSV ingest pool settings from dags/config/dag_config.py${NC}"
+    exit 1
+fi
+airflow pools set "$POOL_NAME" "$POOL_SLOTS" "Concurrent CSV loads into SQL Server" > /dev/null
+echo -e "${GREEN}Pool $POOL_NAME ready ($POOL_SLOTS slots)${NC}"
+
 echo ""
 echo -e "${YELLOW}Starting Airflow Scheduler...${NC}"
 nohup airflow scheduler > logs/scheduler.log 2>&1 &